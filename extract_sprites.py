@@ -8,16 +8,29 @@ frame of each entity's sprite. Uses the NES 8x16 sprite rendering pipeline:
 Output: enemy_sprites/XX.png for each entity ID $00-$8F with a valid sprite.
 """
 
+import functools
+import mmap
 import os
 import struct
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
 from PIL import Image
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; blit_tile falls back to NumPy
+    njit = None
+
 ROM_PATH = "mm3_orig_test.nes"
 OUTPUT_DIR = "enemy_sprites"
 HEADER_SIZE = 16
 PRG_BANK_SIZE = 0x2000  # 8KB per bank
 PRG_BANKS = 32
 CHR_START = HEADER_SIZE + PRG_BANKS * PRG_BANK_SIZE  # after 16 + 256KB PRG
+CHR_SIZE = 0x20000  # 16 CHR banks × 8KB
+
+# ROM file offset of the start of each PRG bank
+BANK_BASE = [HEADER_SIZE + b * PRG_BANK_SIZE for b in range(PRG_BANKS)]
 
 # --- NES master palette (FCEUX standard 2C02) ---
 NES_PALETTE = [
@@ -38,6 +51,12 @@ NES_PALETTE = [
     (0xE1,0xE5,0x8D), (0xBE,0xF0,0x8D), (0xA4,0xF5,0xA2), (0x98,0xF2,0xC8),
     (0x9E,0xE8,0xFC), (0xAE,0xAE,0xAE), (0x00,0x00,0x00), (0x00,0x00,0x00),
 ]
+# Opaque RGBA lookup table, gathered directly by build_param_palettes
+NES_PALETTE_RGBA = np.array([(r, g, b, 255) for r, g, b in NES_PALETTE], dtype=np.uint8)
+
+# Two's-complement value of each byte, for signed sprite position offsets
+SIGNED_BYTE = np.arange(256, dtype=np.int16)
+SIGNED_BYTE[128:] -= 256
 
 # Default sprite palettes (SP0-SP1) from fixed bank at $C898
 # SP0: Mega Man (black, sky-blue, blue)
@@ -47,14 +66,13 @@ DEFAULT_SP01 = [0x0F, 0x0F, 0x2C, 0x11, 0x0F, 0x0F, 0x30, 0x37]
 # Per-stage SP2-SP3 palette table offset in bank $01 at $A030
 SP23_TABLE_ADDR = 0xA030
 
+# Decoded CHR tiles keyed by ROM offset, used only by the numba-less blit_tile
+# fallback. CHR data never changes during a run, so entries are shared across
+# entities and CHR configs.
+_TILE_CACHE = {}
 
-def nes_color_to_rgba(nes_idx, transparent=False):
-    """Convert NES palette index to RGBA tuple."""
-    if transparent:
-        return (0, 0, 0, 0)
-    nes_idx &= 0x3F  # mask to valid range
-    r, g, b = NES_PALETTE[nes_idx]
-    return (r, g, b, 255)
+# Per-process state for process_entity, filled in by _init_worker
+_WORKER_STATE = {}
 
 
 def build_stage_palettes(rom, stage):
@@ -72,29 +90,16 @@ def build_param_palettes(rom, param):
     The $A000 init routine in bank $01 indexes the $A030 palette table
     by param*8. SP0-SP1 are always fixed defaults from $C898.
     SP2-SP3 are read from $A030 + param*8.
+
+    Returns a (4, 4, 4) uint8 array indexed [palette][color][RGBA], with
+    color 0 of every palette fully transparent.
     """
-    palettes = []
-    # SP0 and SP1 from defaults
-    for pal_idx in range(2):
-        base = pal_idx * 4
-        pal = [
-            nes_color_to_rgba(DEFAULT_SP01[base], transparent=True),  # color 0 = transparent
-            nes_color_to_rgba(DEFAULT_SP01[base + 1]),
-            nes_color_to_rgba(DEFAULT_SP01[base + 2]),
-            nes_color_to_rgba(DEFAULT_SP01[base + 3]),
-        ]
-        palettes.append(pal)
-    # SP2 and SP3 from param-indexed table
+    # SP0-SP1 from defaults, SP2-SP3 from the param-indexed table
     table_off = prg_offset(0x01, SP23_TABLE_ADDR + param * 8)
-    for pal_idx in range(2):
-        base = pal_idx * 4
-        pal = [
-            nes_color_to_rgba(rom[table_off + base], transparent=True),
-            nes_color_to_rgba(rom[table_off + base + 1]),
-            nes_color_to_rgba(rom[table_off + base + 2]),
-            nes_color_to_rgba(rom[table_off + base + 3]),
-        ]
-        palettes.append(pal)
+    indices = np.array(DEFAULT_SP01 + list(rom[table_off:table_off + 8]),
+                       dtype=np.uint8).reshape(4, 4)
+    palettes = NES_PALETTE_RGBA[indices & 0x3F]  # mask to valid range
+    palettes[:, 0] = 0  # color 0 = transparent
     return palettes
 
 
@@ -102,78 +107,99 @@ def prg_offset(bank, cpu_addr):
     """ROM file offset for a PRG bank CPU address ($8000-$BFFF)."""
     if cpu_addr >= 0xC000:
         # Fixed bank $1E/$1F
-        bank = 0x1E + (cpu_addr - 0xC000) // PRG_BANK_SIZE
-        local = (cpu_addr - 0xC000) % PRG_BANK_SIZE
-    elif cpu_addr >= 0xA000:
-        local = cpu_addr - 0xA000
-    else:
-        local = cpu_addr - 0x8000
-    return HEADER_SIZE + bank * PRG_BANK_SIZE + local
+        rel = cpu_addr - 0xC000
+        return BANK_BASE[0x1E + (rel >> 13)] + (rel & 0x1FFF)
+    # $8000-$9FFF and $A000-$BFFF both map to the bank's local offset
+    return BANK_BASE[bank] + (cpu_addr & 0x1FFF)
+
+
+@functools.lru_cache(maxsize=None)
+def chr_page_bases(chr_regs):
+    """ROM file offsets of the eight 1KB PPU pattern windows ($0000-$1FFF).
+
+    Registers 0-1 are 2KB banks covering two consecutive pages each
+    ($0000/$0800); registers 2-5 are 1KB banks at $1000-$1C00. chr_regs must
+    be a tuple so the table can be memoized per config.
+    """
+    pages = (chr_regs[0], chr_regs[0] + 1, chr_regs[1], chr_regs[1] + 1,
+             chr_regs[2], chr_regs[3], chr_regs[4], chr_regs[5])
+    bases = CHR_START + np.array(pages, dtype=np.int64) * 0x400
+    bases.setflags(write=False)
+    return bases
 
 
 def chr_ppu_to_rom(ppu_addr, chr_regs):
-    """Convert PPU address to ROM file offset using CHR bank registers."""
-    if ppu_addr < 0x0800:
-        page = chr_regs[0]  # 2KB register, covers 2 pages
-        sub = ppu_addr // 0x400
-        local = ppu_addr % 0x400
-        return CHR_START + (page + sub) * 0x400 + local
-    elif ppu_addr < 0x1000:
-        page = chr_regs[1]
-        rel = ppu_addr - 0x0800
-        sub = rel // 0x400
-        local = rel % 0x400
-        return CHR_START + (page + sub) * 0x400 + local
-    elif ppu_addr < 0x1400:
-        page = chr_regs[2]
-        local = ppu_addr - 0x1000
-        return CHR_START + page * 0x400 + local
-    elif ppu_addr < 0x1800:
-        page = chr_regs[3]
-        local = ppu_addr - 0x1400
-        return CHR_START + page * 0x400 + local
-    elif ppu_addr < 0x1C00:
-        page = chr_regs[4]
-        local = ppu_addr - 0x1800
-        return CHR_START + page * 0x400 + local
-    else:
-        page = chr_regs[5]
-        local = ppu_addr - 0x1C00
-        return CHR_START + page * 0x400 + local
-
-
-def decode_tile_8x8(rom, rom_offset):
-    """Decode a 16-byte NES 2bpp tile into 8x8 array of palette indices (0-3)."""
-    if rom_offset < 0 or rom_offset + 16 > len(rom):
-        return [[0]*8 for _ in range(8)]  # blank tile for out-of-bounds
-    pixels = []
-    for row in range(8):
-        lo = rom[rom_offset + row]
-        hi = rom[rom_offset + row + 8]
-        row_px = []
-        for col in range(7, -1, -1):
-            px = ((lo >> col) & 1) | (((hi >> col) & 1) << 1)
-            row_px.append(px)
-        pixels.append(row_px)
-    return pixels
-
-
-def get_8x8_tile(rom, tile_id, chr_regs):
-    """Get one 8x8 tile for an 8x8 sprite mode tile ID.
-
-    MM3 uses 8x8 sprite mode with PPUCTRL bit 3 = 1 (sprites at $1000).
-    Tile PPU address = $1000 + tile_id * 16.
+    """Convert PPU address to ROM file offset using CHR bank registers.
+
+    ppu_addr may be an int64 ndarray to map many addresses in one gather.
     """
-    ppu_addr = 0x1000 + tile_id * 16
-    rom_off = chr_ppu_to_rom(ppu_addr, chr_regs)
-    return decode_tile_8x8(rom, rom_off)
+    return chr_page_bases(chr_regs)[ppu_addr >> 10] + (ppu_addr & 0x3FF)
 
 
-def extract_entity_sprite(rom, entity_id, chr_regs, palettes=None):
-    """Extract the first animation frame sprite for an entity.
+def decode_tile_8x8(rom_np, rom_offset):
+    """Decode a 16-byte NES 2bpp tile into an 8x8 uint8 array of palette indices (0-3).
 
-    palettes: list of 4 palettes, each a list of 4 RGBA tuples.
-    Returns (image, info_dict) or (None, reason_string).
+    rom_np is the ROM as a uint8 ndarray. Bit 7 of each plane byte is the
+    leftmost pixel, which is the order np.unpackbits produces. The offset is
+    not bounds-checked; load_rom() validates the CHR region up front.
+    """
+    lo = np.unpackbits(rom_np[rom_offset:rom_offset + 8]).reshape(8, 8)
+    hi = np.unpackbits(rom_np[rom_offset + 8:rom_offset + 16]).reshape(8, 8)
+    return lo | (hi << 1)
+
+
+def cached_tile(rom_np, rom_off):
+    """Decode the tile at rom_off, memoized in _TILE_CACHE.
+
+    Only the NumPy blit_tile fallback uses this; the JIT kernel decodes inline.
+    The returned array is read-only; flip it by slicing.
+    """
+    tile = _TILE_CACHE.get(rom_off)
+    if tile is None:
+        tile = decode_tile_8x8(rom_np, rom_off)
+        tile.setflags(write=False)
+        _TILE_CACHE[rom_off] = tile
+    return tile
+
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def blit_tile(rom_np, off, h_flip, v_flip, lut, canvas, bx, by):
+        """Decode, flip and draw the tile at rom_np[off] onto canvas at (bx, by).
+
+        lut is one (4, 4) RGBA palette; color 0 is transparent.
+        The caller must ensure off + 16 is within the ROM.
+        """
+        for row in range(8):
+            r = 7 - row if v_flip else row
+            lo = rom_np[off + r]
+            hi = rom_np[off + r + 8]
+            for col in range(8):
+                c = col if h_flip else 7 - col
+                px = ((lo >> c) & 1) | (((hi >> c) & 1) << 1)
+                if px:
+                    canvas[by + row, bx + col] = lut[px]
+else:
+    def blit_tile(rom_np, off, h_flip, v_flip, lut, canvas, bx, by):
+        """NumPy fallback for the JIT tile blitter (same contract)."""
+        tile = cached_tile(rom_np, off)
+        if v_flip:
+            tile = tile[::-1]
+        if h_flip:
+            tile = tile[:, ::-1]
+        mask = tile != 0
+        canvas[by:by + 8, bx:bx + 8][mask] = lut[tile][mask]
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_entity_sprites(rom, entity_id):
+    """Resolve the first animation frame of an entity to its sprite layout.
+
+    None of this depends on CHR banks or palettes, so it is memoized per
+    entity and shared by every config tried for it.
+    Returns (frame, info_dict) or (None, reason_string), where frame holds
+    per-sprite arrays (tile ID, blit position, palette, flips) and the
+    bounding box size.
     """
     # 1. Get OAM ID from bank $00, table at $A300
     oam_id = rom[prg_offset(0x00, 0xA300 + entity_id)]
@@ -232,75 +258,28 @@ def extract_entity_sprite(rom, entity_id, chr_regs, palettes=None):
     # Position data: Y0, X0, Y1, X1, ... for each sprite
     pos_off = prg_offset(pos_bank, pos_ptr)
 
-    # 8. Read all sprites: tile IDs, attributes, positions
-    sprites = []
-    for i in range(sprite_count):
-        tile_id = rom[def_off + 2 + i * 2]
-        attr = rom[def_off + 3 + i * 2]
-        y_off_raw = rom[pos_off + i * 2]
-        x_off_raw = rom[pos_off + i * 2 + 1]
-        # Convert to signed
-        y_off = y_off_raw if y_off_raw < 128 else y_off_raw - 256
-        x_off = x_off_raw if x_off_raw < 128 else x_off_raw - 256
-        palette_idx = attr & 0x03
-        h_flip = bool(attr & 0x40)
-        v_flip = bool(attr & 0x80)
-        sprites.append({
-            'tile_id': tile_id,
-            'y_off': y_off,
-            'x_off': x_off,
-            'palette': palette_idx,
-            'h_flip': h_flip,
-            'v_flip': v_flip,
-        })
-
-    if not sprites:
+    # 8. Read all sprites as parallel arrays: (tile ID, attr) pairs from the
+    # definition, signed (Y, X) offset pairs from the position table
+    rom_np = np.frombuffer(rom, dtype=np.uint8)
+    raw = rom_np[def_off + 2:def_off + 2 + 2 * sprite_count].reshape(-1, 2)
+    pos = SIGNED_BYTE[rom_np[pos_off:pos_off + 2 * sprite_count]].reshape(-1, 2)
+    tile_ids = raw[:, 0]
+    attrs = raw[:, 1]
+    y_offs = pos[:, 0]
+    x_offs = pos[:, 1]
+
+    if tile_ids.size == 0:
         return None, "no sprites"
 
     # 9. Calculate bounding box
-    min_x = min(s['x_off'] for s in sprites)
-    min_y = min(s['y_off'] for s in sprites)
-    max_x = max(s['x_off'] + 8 for s in sprites)
-    max_y = max(s['y_off'] + 8 for s in sprites)
-
-    width = max_x - min_x
-    height = max_y - min_y
+    min_x = int(x_offs.min())
+    min_y = int(y_offs.min())
+    width = int(x_offs.max()) + 8 - min_x
+    height = int(y_offs.max()) + 8 - min_y
 
     if width <= 0 or height <= 0 or width > 128 or height > 128:
         return None, f"bad dimensions {width}x{height}"
 
-    # 10. Render to image
-    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-
-    all_blank = True
-    for s in sprites:
-        tile = get_8x8_tile(rom, s['tile_id'], chr_regs)
-        palette = palettes[s['palette']]
-
-        # Apply V-flip: reverse row order
-        if s['v_flip']:
-            tile = tile[::-1]
-
-        # Apply H-flip: reverse each row
-        if s['h_flip']:
-            tile = [row[::-1] for row in tile]
-
-        # Draw 8x8 tile
-        bx = s['x_off'] - min_x
-        by = s['y_off'] - min_y
-        for row in range(8):
-            for col in range(8):
-                px = tile[row][col]
-                if px > 0:
-                    all_blank = False
-                    img.putpixel((bx + col, by + row), palette[px])
-
-    if all_blank:
-        return None, "all tiles blank (wrong CHR bank?)"
-
-    # Scale up 3x for visibility
-    img = img.resize((width * 3, height * 3), Image.NEAREST)
-
     info = {
         'oam_id': oam_id,
         'anim_bank': anim_bank,
@@ -310,38 +289,82 @@ def extract_entity_sprite(rom, entity_id, chr_regs, palettes=None):
         'hp': rom[prg_offset(0x00, 0xA400 + entity_id)],
         'main_routine': rom[prg_offset(0x00, 0xA100 + entity_id)],
     }
+    frame = {
+        'tile_ids': tile_ids,
+        'xs': x_offs - min_x,  # blit position within the bounding box
+        'ys': y_offs - min_y,
+        'pal_idx': attrs & 0x03,
+        'h_flips': (attrs & 0x40) != 0,
+        'v_flips': (attrs & 0x80) != 0,
+        'width': width,
+        'height': height,
+    }
+    for arr in frame.values():
+        if isinstance(arr, np.ndarray):
+            arr.setflags(write=False)  # shared via the lru_cache
+    return frame, info
+
+
+def render_sprites(rom_np, frame, chr_regs, palettes):
+    """Render a resolved sprite frame with the given CHR banks and palettes.
+
+    Returns the image at native resolution, or None if every tile is blank.
+    """
+    ppu_addrs = 0x1000 + frame['tile_ids'].astype(np.int64) * 16
+    tile_offs = chr_ppu_to_rom(ppu_addrs, chr_regs)
+    # Tiles on CHR pages past the end of CHR ROM render blank
+    in_chr = tile_offs + 16 <= len(rom_np)
+
+    # A tile is blank iff all 16 of its bytes are zero (color 0 is
+    # transparent), so wrong CHR configs can be rejected before rendering
+    if not rom_np[tile_offs[in_chr, None] + np.arange(16)].any():
+        return None
+
+    width, height = frame['width'], frame['height']
+    canvas = np.zeros((height, width, 4), dtype=np.uint8)
+
+    for rom_off, bx, by, pal, h_flip, v_flip in zip(
+            tile_offs[in_chr].tolist(), frame['xs'][in_chr].tolist(),
+            frame['ys'][in_chr].tolist(), frame['pal_idx'][in_chr].tolist(),
+            frame['h_flips'][in_chr].tolist(), frame['v_flips'][in_chr].tolist()):
+        blit_tile(rom_np, rom_off, h_flip, v_flip, palettes[pal], canvas, bx, by)
+
+    return Image.fromarray(canvas)
+
+
+def extract_entity_sprite(rom, rom_np, entity_id, chr_regs, palettes=None):
+    """Extract the first animation frame sprite for an entity.
+
+    rom_np: the ROM as a uint8 ndarray, used for tile decoding.
+    palettes: (4, 4, 4) uint8 RGBA array from build_param_palettes().
+    Returns (image, info_dict) or (None, reason_string).
+    """
+    frame, info = resolve_entity_sprites(rom, entity_id)
+    if frame is None:
+        return None, info
+    img = render_sprites(rom_np, frame, chr_regs, palettes)
+    if img is None:
+        return None, "all tiles blank (wrong CHR bank?)"
     return img, info
 
 
-def score_sprite_coherence(rom, entity_id, chr_regs, palettes):
+def score_sprite_coherence(rom, rom_np, entity_id, chr_regs, palettes):
     """Score a sprite rendering by visual coherence (connected vs scattered).
 
     Correct CHR banks produce tiles that form connected shapes.
     Wrong CHR banks produce scattered noise with many isolated pixels.
     Returns (score, img, info) where higher score = more coherent.
     """
-    img, info = extract_entity_sprite(rom, entity_id, chr_regs, palettes)
+    img, info = extract_entity_sprite(rom, rom_np, entity_id, chr_regs, palettes)
     if img is None:
         return -1, img, info
 
-    # Work on unscaled image (before 3x resize) - undo the resize
-    w, h = img.size
-    uw, uh = w // 3, h // 3
-    small = img.resize((uw, uh), Image.NEAREST)
-    pixels = small.load()
-
-    # Count non-transparent pixels and neighbor connections
-    opaque = 0
-    connections = 0
-    for y in range(uh):
-        for x in range(uw):
-            if pixels[x, y][3] > 0:
-                opaque += 1
-                # Check 4-connected neighbors
-                for dx, dy in [(1, 0), (0, 1)]:
-                    nx, ny = x + dx, y + dy
-                    if 0 <= nx < uw and 0 <= ny < uh and pixels[nx, ny][3] > 0:
-                        connections += 1
+    alpha = np.asarray(img)[..., 3] > 0
+
+    # Count non-transparent pixels and right/down neighbor connections
+    opaque = int(alpha.sum())
+    connections = int(np.logical_and(alpha[:, :-1], alpha[:, 1:]).sum()
+                      + np.logical_and(alpha[:-1, :], alpha[1:, :]).sum())
 
     if opaque == 0:
         return -1, img, info
@@ -355,7 +378,7 @@ def score_sprite_coherence(rom, entity_id, chr_regs, palettes):
     return score, img, info
 
 
-def build_entity_chr_map(rom):
+def build_entity_chr_map(rom, rom_np):
     """Build per-entity CHR configs by scanning enemy tables with per-room CHR.
 
     Each room within a stage has its own CHR/palette param (from $AA60),
@@ -379,34 +402,33 @@ def build_entity_chr_map(rom):
         aa40_off = prg_offset(bank, 0xAA40)
         aa60_off = prg_offset(bank, 0xAA60)
 
-        screen_to_param = {}
-        screen_num = 0
-        for room in range(32):
-            config = rom[aa40_off + room]
-            screen_count = config & 0x1F
-            param = rom[aa60_off + room * 2]
-
-            if param >= 0x40:  # end of valid rooms
-                break
-
-            for s in range(screen_count + 1):
-                screen_to_param[screen_num + s] = param
-            screen_num += screen_count + 1
-
-        # Read enemy table and map each to its room's CHR config
+        # Room r spans (config & 0x1F) + 1 screens; a param >= $40 ends the
+        # valid rooms. Expand to one param per screen number.
+        configs = rom_np[aa40_off:aa40_off + 32]
+        params = rom_np[aa60_off:aa60_off + 64:2]
+        end_rooms = params >= 0x40
+        room_count = int(np.argmax(end_rooms)) if end_rooms.any() else 32
+        screen_params = np.repeat(params[:room_count],
+                                  (configs[:room_count] & 0x1F) + 1).tolist()
+
+        # Read enemy table (terminated by $FF/$FF) and map each entry to its
+        # room's CHR config
         ab00_off = prg_offset(bank, 0xAB00)
         ae00_off = prg_offset(bank, 0xAE00)
+        scr_arr = rom_np[ab00_off:ab00_off + 256]
+        eid_arr = rom_np[ae00_off:ae00_off + 256]
+        sentinel = (scr_arr == 0xFF) & (eid_arr == 0xFF)
+        end = int(np.argmax(sentinel)) if sentinel.any() else 256
 
-        for i in range(256):
-            scr = rom[ab00_off + i]
-            entity_id = rom[ae00_off + i]
-            if scr == 0xFF and entity_id == 0xFF:
-                break
+        for scr, entity_id in zip(scr_arr[:end].tolist(), eid_arr[:end].tolist()):
             if entity_id <= 0x8F:
-                param = screen_to_param.get(scr, stage)  # fallback to stage index
+                if scr < len(screen_params):
+                    param = screen_params[scr]
+                else:
+                    param = stage  # fallback to stage index
                 ec = rom[chr_table_off + param * 2]
                 ed = rom[chr_table_off + param * 2 + 1]
-                chr_regs = [e8, e9, 0x00, 0x01, ec, ed]
+                chr_regs = (e8, e9, 0x00, 0x01, ec, ed)
 
                 if entity_id not in entity_configs:
                     entity_configs[entity_id] = []
@@ -450,9 +472,118 @@ def entity_has_stage_tiles(rom, entity_id):
     return False
 
 
-def main():
+def load_rom():
+    """Map the ROM read-only.
+
+    Returns (rom, rom_np): rom[i] yields ints for the pointer chasing, and
+    rom_np is a zero-copy uint8 view of the same pages for the vectorized paths.
+    """
     with open(ROM_PATH, 'rb') as f:
-        rom = f.read()
+        rom = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(rom) < CHR_START + CHR_SIZE:
+        raise ValueError(f"{ROM_PATH}: {len(rom)} bytes, too small for 128KB CHR")
+    rom_np = np.frombuffer(rom, dtype=np.uint8)
+
+    # Pay the JIT compile cost (or load it from cache) before extracting
+    blit_tile(rom_np, CHR_START, False, False, np.zeros((4, 4), dtype=np.uint8),
+              np.zeros((8, 8, 4), dtype=np.uint8), 0, 0)
+    return rom, rom_np
+
+
+def _init_worker(entity_chr_map):
+    """ProcessPoolExecutor initializer: map the ROM once per worker."""
+    rom, rom_np = load_rom()
+    _WORKER_STATE['rom'] = rom
+    _WORKER_STATE['rom_np'] = rom_np
+    _WORKER_STATE['entity_chr_map'] = entity_chr_map
+
+
+def process_entity(eid):
+    """Pick the best CHR config for one entity and render its sprite.
+
+    Runs in a worker process (see _init_worker).
+    Returns (eid, img, info, stage, param, in_level_data) where img is the
+    native resolution image or None, info is the info dict or a reason
+    string, and in_level_data says whether the entity had room CHR configs.
+    """
+    rom = _WORKER_STATE['rom']
+    rom_np = _WORKER_STATE['rom_np']
+    entity_chr_map = _WORKER_STATE['entity_chr_map']
+    chr_table_off = prg_offset(0x01, 0xA200)
+
+    has_stage_tiles = entity_has_stage_tiles(rom, eid)
+    entity_configs = entity_chr_map.get(eid)
+
+    if entity_configs and has_stage_tiles:
+        # Entity has per-room CHR configs — prefer robot master stages (0-7)
+        # over Doc Robot (8-11) over Wily fortress (12+), because bosses
+        # appear in Wily stages with wrong initial-room CHR (the game
+        # switches CHR dynamically when the boss spawns).
+        rm_configs = [(s, c, p) for s, c, p in entity_configs if s < 8]
+        doc_configs = [(s, c, p) for s, c, p in entity_configs if 8 <= s < 12]
+        wily_configs = [(s, c, p) for s, c, p in entity_configs if s >= 12]
+        preferred = rm_configs or doc_configs or wily_configs
+
+        seen = set()
+        configs_to_try = []
+        for stage, chr_regs, param in preferred:
+            key = (chr_regs[4], chr_regs[5])  # (ec, ed)
+            if key not in seen:
+                seen.add(key)
+                palettes = build_param_palettes(rom, param)
+                configs_to_try.append({
+                    'stage': stage,
+                    'chr_regs': chr_regs,
+                    'palettes': palettes,
+                    'param': param,
+                })
+    elif entity_configs:
+        # Entity uses only shared tiles — any config works, use first
+        stage, chr_regs, param = entity_configs[0]
+        palettes = build_param_palettes(rom, param)
+        configs_to_try = [{'stage': stage, 'chr_regs': chr_regs,
+                           'palettes': palettes, 'param': param}]
+    else:
+        # Entity not in level data — try all 58 CHR params ($00-$39)
+        # from the $A200 table, not just the 18 stage defaults.
+        # Fortress bosses and spawned entities may use non-default params.
+        seen = set()
+        configs_to_try = []
+        for param in range(0x3A):
+            ec = rom[chr_table_off + param * 2]
+            ed = rom[chr_table_off + param * 2 + 1]
+            key = (ec, ed)
+            if key not in seen:
+                seen.add(key)
+                chr_regs = (0, 0, 0x00, 0x01, ec, ed)
+                palettes = build_param_palettes(rom, param)
+                configs_to_try.append({
+                    'stage': -1,
+                    'chr_regs': chr_regs,
+                    'palettes': palettes,
+                    'param': param,
+                })
+
+    best_count = -1
+    best_img = None
+    best_info = None
+    best_stage = -1
+    best_param = -1
+
+    for cfg in configs_to_try:
+        count, img, info = score_sprite_coherence(rom, rom_np, eid, cfg['chr_regs'], cfg['palettes'])
+        if count > best_count:
+            best_count = count
+            best_img = img
+            best_info = info
+            best_stage = cfg['stage']
+            best_param = cfg.get('param', -1)
+
+    return eid, best_img, best_info, best_stage, best_param, bool(entity_configs)
+
+
+def main():
+    rom, rom_np = load_rom()
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -463,7 +594,7 @@ def main():
     ]
 
     # Build entity → per-room CHR configs from $AE00 + $AA40/$AA60 tables
-    entity_chr_map = build_entity_chr_map(rom)
+    entity_chr_map = build_entity_chr_map(rom, rom_np)
     print(f"Entity→CHR mapping: {len(entity_chr_map)} entities in level data")
 
     # Fallback: per-stage default configs for entities not in level data
@@ -477,103 +608,53 @@ def main():
         e9 = rom[prg_offset(stg_bank, 0xAA81)]
         fallback_configs.append({
             'stage': stage,
-            'chr_regs': [e8, e9, 0x00, 0x01, ec, ed],
+            'chr_regs': (e8, e9, 0x00, 0x01, ec, ed),
             'palettes': build_stage_palettes(rom, stage),
         })
 
     success = 0
     failed = 0
 
-    for eid in range(0x90):
-        has_stage_tiles = entity_has_stage_tiles(rom, eid)
-        entity_configs = entity_chr_map.get(eid)
-
-        if entity_configs and has_stage_tiles:
-            # Entity has per-room CHR configs — prefer robot master stages (0-7)
-            # over Doc Robot (8-11) over Wily fortress (12+), because bosses
-            # appear in Wily stages with wrong initial-room CHR (the game
-            # switches CHR dynamically when the boss spawns).
-            rm_configs = [(s, c, p) for s, c, p in entity_configs if s < 8]
-            doc_configs = [(s, c, p) for s, c, p in entity_configs if 8 <= s < 12]
-            wily_configs = [(s, c, p) for s, c, p in entity_configs if s >= 12]
-            preferred = rm_configs or doc_configs or wily_configs
-
-            seen = set()
-            configs_to_try = []
-            for stage, chr_regs, param in preferred:
-                key = (chr_regs[4], chr_regs[5])  # (ec, ed)
-                if key not in seen:
-                    seen.add(key)
-                    palettes = build_param_palettes(rom, param)
-                    configs_to_try.append({
-                        'stage': stage,
-                        'chr_regs': chr_regs,
-                        'palettes': palettes,
-                        'param': param,
-                    })
-        elif entity_configs:
-            # Entity uses only shared tiles — any config works, use first
-            stage, chr_regs, param = entity_configs[0]
-            palettes = build_param_palettes(rom, param)
-            configs_to_try = [{'stage': stage, 'chr_regs': chr_regs,
-                               'palettes': palettes, 'param': param}]
-        else:
-            # Entity not in level data — try all 58 CHR params ($00-$39)
-            # from the $A200 table, not just the 18 stage defaults.
-            # Fortress bosses and spawned entities may use non-default params.
-            seen = set()
-            configs_to_try = []
-            for param in range(0x3A):
-                ec = rom[chr_table_off + param * 2]
-                ed = rom[chr_table_off + param * 2 + 1]
-                key = (ec, ed)
-                if key not in seen:
-                    seen.add(key)
-                    chr_regs = [0, 0, 0x00, 0x01, ec, ed]
-                    palettes = build_param_palettes(rom, param)
-                    configs_to_try.append({
-                        'stage': -1,
-                        'chr_regs': chr_regs,
-                        'palettes': palettes,
-                        'param': param,
-                    })
-
-        best_count = -1
-        best_img = None
-        best_info = None
-        best_stage = -1
-        best_param = -1
-
-        for cfg in configs_to_try:
-            count, img, info = score_sprite_coherence(rom, eid, cfg['chr_regs'], cfg['palettes'])
-            if count > best_count:
-                best_count = count
-                best_img = img
-                best_info = info
-                best_stage = cfg['stage']
-                best_param = cfg.get('param', -1)
-
-        if best_img is not None:
-            path = os.path.join(OUTPUT_DIR, f"{eid:02X}.png")
-            best_img.save(path)
-            hp = best_info['hp']
-            hp_str = "INV" if hp == 0xFF else str(hp)
-            if best_stage >= 0 and best_stage < len(stage_names):
-                stg_name = stage_names[best_stage]
+    # Entities are independent and the ROM is read-only, so extract them in
+    # worker processes. map() yields results in entity order for printing.
+    # PNG encoding and disk writes overlap with extraction on a thread pool.
+    writes = []
+    # 0x90 entities in chunks of 8 is 18 tasks; more workers would only each
+    # re-map the ROM and warm up the JIT for nothing.
+    max_workers = min(os.cpu_count() or 1, 0x90 // 8)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(entity_chr_map,)) as executor, \
+            ThreadPoolExecutor(max_workers=2) as write_pool:
+        results = executor.map(process_entity, range(0x90), chunksize=8)
+        for eid, best_img, best_info, best_stage, best_param, in_level_data in results:
+            if best_img is not None:
+                path = os.path.join(OUTPUT_DIR, f"{eid:02X}.png")
+                # Scale up 3x for visibility
+                best_img = best_img.resize((best_img.width * 3, best_img.height * 3), Image.NEAREST)
+                # Fast deflate: the files are tiny, so size barely changes
+                writes.append(write_pool.submit(best_img.save, path,
+                                                optimize=False, compress_level=1))
+                hp = best_info['hp']
+                hp_str = "INV" if hp == 0xFF else str(hp)
+                if best_stage >= 0 and best_stage < len(stage_names):
+                    stg_name = stage_names[best_stage]
+                else:
+                    stg_name = "param"
+                mapped = "room" if in_level_data else "heuristic"
+                param_str = f"p${best_param:02X}" if best_param >= 0 else ""
+                print(f"  ${eid:02X}: OAM=${best_info['oam_id']:02X} "
+                      f"main=${best_info['main_routine']:02X} HP={hp_str} "
+                      f"sprites={best_info['sprite_count']} "
+                      f"CHR={stg_name} {param_str} ({mapped}) → {path}")
+                success += 1
             else:
-                stg_name = "param"
-            mapped = "room" if entity_configs else "heuristic"
-            param_str = f"p${best_param:02X}" if best_param >= 0 else ""
-            print(f"  ${eid:02X}: OAM=${best_info['oam_id']:02X} "
-                  f"main=${best_info['main_routine']:02X} HP={hp_str} "
-                  f"sprites={best_info['sprite_count']} "
-                  f"CHR={stg_name} {param_str} ({mapped}) → {path}")
-            success += 1
-        else:
-            reason = best_info if isinstance(best_info, str) else "unknown"
-            if reason != "no OAM ID":
-                print(f"  ${eid:02X}: SKIP ({reason})")
-            failed += 1
+                reason = best_info if isinstance(best_info, str) else "unknown"
+                if reason != "no OAM ID":
+                    print(f"  ${eid:02X}: SKIP ({reason})")
+                failed += 1
+
+    for write in writes:
+        write.result()  # re-raise any save error
 
     print(f"\nDone: {success} sprites extracted, {failed} skipped")
 